@@ -3,6 +3,7 @@ This module holds the code of the Markdown extension responsible for matching "a
 
 The extension is composed of a Markdown [block processor](https://python-markdown.github.io/extensions/api/#blockparser)
 that matches indented blocks starting with a line like '::: identifier'.
+A Markdown preprocessor scans each page beforehand to let handlers collect all of its identifiers at once.
 
 For each of these blocks, it uses a [handler][mkdocstrings.handlers.BaseHandler] to collect documentation about
 the given identifier and render it with Jinja templates.
@@ -24,7 +25,7 @@ instruction:
 """
 import logging
 import re
-from typing import Any, Tuple
+from typing import Any, List, Optional, Tuple
 from xml.etree.ElementTree import XML, Element, ParseError  # noqa: S405 (we choose to trust the XML input)
 
 import yaml
@@ -33,6 +34,7 @@ from markdown import Markdown
 from markdown.blockparser import BlockParser
 from markdown.blockprocessors import BlockProcessor
 from markdown.extensions import Extension
+from markdown.preprocessors import Preprocessor
 from markdown.util import AtomicString
 from mkdocs.utils import warning_filter
 
@@ -127,11 +129,15 @@ class AutoDocProcessor(BlockProcessor):
 
         if match:
             identifier = match.group(1)
-            log.debug(f"mkdocstrings.extension: Matched '::: {identifier}'")
+            # check the level once: these messages are logged for every object
+            debug = log.isEnabledFor(logging.DEBUG)
+            if debug:
+                log.debug(f"mkdocstrings.extension: Matched '::: {identifier}'")
             config = yaml.safe_load(str(block)) or {}
 
             handler_name = self.get_handler_name(config)
-            log.debug(f"mkdocstrings.extension: Using handler '{handler_name}'")
+            if debug:
+                log.debug(f"mkdocstrings.extension: Using handler '{handler_name}'")
             handler_config = self.get_handler_config(handler_name)
             handler = get_handler(
                 handler_name,
@@ -142,17 +148,20 @@ class AutoDocProcessor(BlockProcessor):
 
             selection, rendering = self.get_item_configs(handler_config, config)
 
-            log.debug("mkdocstrings.extension: Collecting data")
+            if debug:
+                log.debug("mkdocstrings.extension: Collecting data")
             try:
                 data: Any = handler.collector.collect(identifier, selection)
             except CollectionError:
                 log.error(f"mkdocstrings.extension: Could not collect '{identifier}'")
                 raise
 
-            log.debug("mkdocstrings.extension: Updating renderer's env")
+            if debug:
+                log.debug("mkdocstrings.extension: Updating renderer's env")
             handler.renderer.update_env(self.md, self._config)
 
-            log.debug("mkdocstrings.extension: Rendering templates")
+            if debug:
+                log.debug("mkdocstrings.extension: Rendering templates")
             try:
                 rendered = handler.renderer.render(data, rendering)
             except TemplateNotFound as error:
@@ -163,7 +172,8 @@ class AutoDocProcessor(BlockProcessor):
                 )
                 raise
 
-            log.debug("mkdocstrings.extension: Loading HTML back into XML tree")
+            if debug:
+                log.debug("mkdocstrings.extension: Loading HTML back into XML tree")
             try:
                 as_xml = XML(rendered)
             except ParseError as error:
@@ -241,6 +251,91 @@ class AutoDocProcessor(BlockProcessor):
         return item_selection_config, item_rendering_config
 
 
+class AutoDocPreprocessor(Preprocessor):
+    """
+    Our "autodoc" Markdown preprocessor.
+
+    It does not modify the Markdown text. It scans a page for autodoc instructions before the
+    [block processor][mkdocstrings.extension.AutoDocProcessor] runs, and
+    [enqueues][mkdocstrings.handlers.BaseCollector.enqueue] their identifiers into the handlers' collectors.
+    It allows collectors to collect all the objects of a page at once.
+    """
+
+    def __init__(self, md: Markdown, processor: AutoDocProcessor, config: dict) -> None:
+        """
+        Initialization method.
+
+        Arguments:
+            md: A `markdown.Markdown` instance.
+            processor: The block processor, providing utility methods to get handlers and their configuration.
+            config: The [configuration][mkdocstrings.plugin.MkdocstringsPlugin.config_scheme]
+                of the `mkdocstrings` plugin.
+        """
+        super().__init__(md=md)
+        self.processor = processor
+        self._config = config
+
+    def run(self, lines: List[str]) -> List[str]:
+        """
+        Enqueue the identifier of each autodoc instruction found in the given lines.
+
+        Arguments:
+            lines: The lines of the page.
+
+        Returns:
+            The same lines, untouched.
+        """
+        indent = " " * self.md.tab_length
+        identifier: Optional[str] = None
+        block: List[str] = []
+
+        for line in lines:
+            if identifier is not None:
+                if line.startswith(indent) and line.strip():
+                    block.append(line[len(indent) :])
+                    continue
+                self.enqueue(identifier, block)
+                identifier = None
+
+            match = self.processor.RE.match(line)
+            if match:
+                identifier = match.group(1)
+                block = []
+
+        if identifier is not None:
+            self.enqueue(identifier, block)
+
+        return lines
+
+    def enqueue(self, identifier: str, block: List[str]) -> None:
+        """
+        Enqueue an identifier into the collector of its handler.
+
+        Arguments:
+            identifier: The identifier of the autodoc instruction.
+            block: The dedented YAML configuration lines of the autodoc instruction.
+        """
+        try:
+            config = yaml.safe_load("\n".join(block)) or {}
+        except yaml.YAMLError:
+            # the block processor will report it
+            return
+
+        handler_name = self.processor.get_handler_name(config)
+        handler_config = self.processor.get_handler_config(handler_name)
+        handler = get_handler(
+            handler_name,
+            self._config["theme_name"],
+            self._config["mkdocstrings"]["custom_templates"],
+            **handler_config,
+        )
+        selection, _ = self.processor.get_item_configs(handler_config, config)
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"mkdocstrings.extension: Enqueuing '{identifier}'")
+        handler.collector.enqueue(identifier, selection)
+
+
 class MkdocstringsExtension(Extension):
     """
     Our Markdown extension.
@@ -264,7 +359,9 @@ class MkdocstringsExtension(Extension):
         """
         Register the extension.
 
-        Add an instance of our [`AutoDocProcessor`][mkdocstrings.extension.AutoDocProcessor] to the Markdown parser.
+        Add an instance of our [`AutoDocProcessor`][mkdocstrings.extension.AutoDocProcessor] to the Markdown parser,
+        and an instance of our [`AutoDocPreprocessor`][mkdocstrings.extension.AutoDocPreprocessor]
+        to its preprocessors.
 
         Args:
             md: A `markdown.Markdown` instance.
@@ -272,3 +369,4 @@ class MkdocstringsExtension(Extension):
         md.registerExtension(self)
         processor = AutoDocProcessor(md.parser, md, self._config)
         md.parser.blockprocessors.register(processor, "mkdocstrings", 110)
+        md.preprocessors.register(AutoDocPreprocessor(md, processor, self._config), "mkdocstrings", 5)
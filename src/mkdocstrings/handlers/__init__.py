@@ -184,6 +184,18 @@ class BaseCollector:
         """
         raise NotImplementedError
 
+    def enqueue(self, identifier: str, config: dict) -> None:
+        """
+        Announce that data will soon be collected for an identifier.
+
+        Collectors able to collect many identifiers at once can implement this method to queue them up,
+        and collect them all in a single batch on the next call to `collect`. By default it does nothing.
+
+        Args:
+            identifier: An identifier for which data will soon be collected.
+            config: Configuration options for the tool you use to collect data.
+        """
+
     def teardown(self) -> None:
         """Placeholder to remember this method can be implemented."""
 
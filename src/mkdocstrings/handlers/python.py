@@ -4,21 +4,51 @@ This module implements a handler for the Python language.
 The handler collects data with [`pytkdocs`](https://github.com/pawamoy/pytkdocs).
 """
 
+import io
 import json
 import logging
 import os
+import queue
+import selectors
 import sys
+import threading
+import traceback
+from concurrent.futures import Future
+from pathlib import Path
 from subprocess import PIPE, Popen  # noqa: S404 (what other option, more secure that PIPE do we have? sockets?)
-from typing import Any, List, Optional
+from subprocess import TimeoutExpired  # noqa: S404
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Set, Tuple
 
+from jinja2 import Template
+from jinja2.exceptions import TemplateNotFound
 from markdown import Markdown
 from mkdocs.utils import warning_filter
 
-from mkdocstrings.handlers import BaseCollector, BaseHandler, BaseRenderer, CollectionError
+from mkdocstrings.handlers import BaseCollector, BaseHandler, BaseRenderer, CollectionError, pytkdocs_worker
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+try:
+    import minijinja
+except ImportError:
+    minijinja = None  # type: ignore
 
 log = logging.getLogger(f"mkdocs.plugins.{__name__}")
 log.addFilter(warning_filter)
 
+PIPE_SIZE = 1 << 20
+"""
+The size of the buffers of the pipes used to communicate with `pytkdocs`, in bytes.
+
+Only used on Linux, where the default size is 64 KiB. It is capped by the value in `/proc/sys/fs/pipe-max-size`.
+"""
+
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)  # only exposed by Python 3.10+
+
 
 class PythonRenderer(BaseRenderer):
     """
@@ -26,6 +56,12 @@ class PythonRenderer(BaseRenderer):
 
     It defines some configuration options, implements the `render` method,
     and overrides the `update_env` method of the [`BaseRenderer` class][mkdocstrings.handlers.BaseRenderer].
+
+    Templates can optionally be rendered with [`minijinja`](https://github.com/mitsuhiko/minijinja),
+    a Jinja-compatible engine written in Rust, much faster than Jinja2. Templates that `minijinja` cannot render
+    are rendered with Jinja2 instead.
+
+    In templates, rendering options are available both as top-level variables and in the `config` dictionary.
     """
 
     FALLBACK_THEME = "material"
@@ -57,20 +93,85 @@ class PythonRenderer(BaseRenderer):
     **`heading_level`** | `int` | The initial heading level to use. | `2`
     """  # noqa: E501
 
+    CATEGORIES = ("attribute", "class", "function", "method", "module")
+    """The categories of objects, each one having its own template."""
+
+    def __init__(
+        self, directory: str, theme: str, custom_templates: Optional[str] = None, template_engine: str = "jinja2"
+    ) -> None:
+        """
+        Initialization method.
+
+        Arguments:
+            directory: The name of the directory containing the themes for this renderer.
+            theme: The name of theme to use.
+            custom_templates: Directory containing custom templates.
+            template_engine: The engine rendering the templates: `jinja2` or `minijinja`.
+                `minijinja` must be installed, otherwise Jinja2 is used.
+        """
+        super(PythonRenderer, self).__init__(directory, theme, custom_templates)
+        self.templates: Dict[str, Template] = {}
+        self.variables: Dict[FrozenSet[Tuple[str, Any]], Dict[str, Any]] = {}
+
+        self.minijinja_env: Optional[Any] = None
+        self.jinja2_only: Set[str] = set()
+        if template_engine == "minijinja":
+            if minijinja is None:
+                log.warning("mkdocstrings.handlers.python: 'minijinja' is not installed, rendering with Jinja2")
+            else:
+                self.minijinja_env = minijinja.Environment(
+                    loader=minijinja.load_from_path(self.env.loader.searchpath),  # type: ignore
+                    trim_blocks=True,
+                    lstrip_blocks=True,
+                    auto_escape_callback=lambda name: "html",
+                )
+
     def render(self, data: Any, config: dict) -> str:  # noqa: D102 (ignore missing docstring)
-        final_config = dict(self.DEFAULT_CONFIG)
-        final_config.update(config)
+        category = data["category"]
+        try:
+            template = self.templates[category]
+        except KeyError:
+            template = self.env.get_template(f"{category}.html")
+
+        context = {**self._variables(config), category: data}
+
+        if self.minijinja_env is not None and category not in self.jinja2_only:
+            try:
+                return self.minijinja_env.render_template(f"{category}.html", **context)
+            except minijinja.TemplateError as error:
+                # unsupported syntax or filter: don't try again with this template
+                log.debug(f"mkdocstrings.handlers.python: Rendering '{category}.html' with Jinja2 instead: {error}")
+                self.jinja2_only.add(category)
 
-        template = self.env.get_template(f"{data['category']}.html")
+        return template.render(**context)
+
+    def _variables(self, config: dict) -> Dict[str, Any]:
+        # the same options are used for most objects: compute their template variables once
+        try:
+            key = frozenset(config.items())
+        except TypeError:  # unhashable option values, like lists
+            return self._compute_variables(config)
+        if key not in self.variables:
+            self.variables[key] = self._compute_variables(config)
+        return self.variables[key]
+
+    def _compute_variables(self, config: dict) -> Dict[str, Any]:
+        final_config = {**self.DEFAULT_CONFIG, **config}
 
         # Heading level is a "state" variable, that will change at each step
         # of the rendering recursion. Therefore, it's easier to use it as a plain value
         # than as an item in a dictionary.
         heading_level = final_config.pop("heading_level")
 
-        return template.render(
-            **{"config": final_config, data["category"]: data, "heading_level": heading_level, "root": True}
-        )
+        # options are also passed as top-level variables: they are resolved once per template,
+        # instead of looking them up in the config dictionary for every object;
+        # the config is shared by all the renderings with the same options, so it is read-only
+        return {
+            **final_config,
+            "config": MappingProxyType(final_config),
+            "heading_level": heading_level,
+            "root": True,
+        }
 
     def update_env(self, md: Markdown, config: dict) -> None:  # noqa: D102 (ignore missing docstring)
         super(PythonRenderer, self).update_env(md, config)
@@ -78,6 +179,19 @@ class PythonRenderer(BaseRenderer):
         self.env.lstrip_blocks = True
         self.env.keep_trailing_newline = False
 
+        if self.minijinja_env is not None:
+            for name in ("highlight", "any", "convert_markdown"):
+                self.minijinja_env.add_filter(name, self.env.filters[name])
+
+        # load the templates once, now that the environment is configured
+        if not self.templates:
+            for category in self.CATEGORIES:
+                try:
+                    self.templates[category] = self.env.get_template(f"{category}.html")
+                except TemplateNotFound:
+                    # render will raise it again if this template is ever needed
+                    log.debug(f"mkdocstrings.handlers.python: Template '{category}.html' not found")
+
 
 class PythonCollector(BaseCollector):
     """
@@ -111,97 +225,208 @@ class PythonCollector(BaseCollector):
     Obviously one could use a single filter instead: `"!^_[^_]"`, which is the default.
     """
 
-    def __init__(self, setup_commands: Optional[List[str]] = None) -> None:
+    def __init__(
+        self,
+        setup_commands: Optional[List[str]] = None,
+        cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        in_process: bool = False,
+    ) -> None:
         """
         Initialization method.
 
-        When instantiating a Python collector, we open a subprocess in the background with `subprocess.Popen`.
-        It will allow us to feed input to and read output from this subprocess, keeping it alive during
-        the whole documentation generation. Spawning a new Python subprocess for each "autodoc" instruction would be
-        too resource intensive, and would slow down `mkdocstrings` a lot.
+        When instantiating a Python collector, we open a [worker][mkdocstrings.handlers.python.PytkdocsWorker]:
+        a subprocess in the background. It will allow us to feed input to and read output from this subprocess,
+        keeping it alive during the whole documentation generation. Spawning a new Python subprocess for each "autodoc"
+        instruction would be too resource intensive, and would slow down `mkdocstrings` a lot.
+
+        More workers are opened when batches contain several objects, up to `max_workers`,
+        to collect objects in parallel.
+
+        Objects can also be collected [in the current process][mkdocstrings.handlers.python.InProcessWorker]
+        instead, unless there are setup commands to run.
 
         Arguments:
             setup_commands: A list of python commands as strings to be executed in the subprocess before `pytkdocs`.
+            cache_dir: A directory in which to persist collected objects from one run to the next.
+                See [`CollectionCache`][mkdocstrings.handlers.python.CollectionCache].
+            max_workers: The maximum number of workers. Defaults to the number of CPUs.
+            in_process: Whether to collect objects in the current process rather than in subprocesses.
 
         """
-        log.debug("mkdocstrings.handlers.python: Opening 'pytkdocs' subprocess")
-        env = os.environ.copy()
-        env["PYTHONUNBUFFERED"] = "1"
+        if in_process and setup_commands:
+            log.warning("mkdocstrings.handlers.python: Setup commands are run in subprocesses, ignoring 'in_process'")
+            in_process = False
 
-        if setup_commands:
-            # prevent the Python interpreter or the setup commands
-            # from writing to stdout as it would break pytkdocs output
-            commands = [
-                "import sys",
-                "from io import StringIO",
-                "from pytkdocs.cli import main as pytkdocs",
-                "sys.stdout = StringIO()",  # redirect stdout to memory buffer
-                *setup_commands,
-                "sys.stdout.flush()",
-                "sys.stdout = sys.__stdout__",  # restore stdout
-                "pytkdocs(['--line-by-line'])",
-            ]
-            cmd = [sys.executable, "-c", "; ".join(commands)]
+        self.setup_commands = setup_commands
+        if in_process:
+            self.max_workers = 1
+            self.workers: List[BaseWorker] = [InProcessWorker()]
         else:
-            cmd = ["pytkdocs", "--line-by-line"]
+            self.max_workers = max_workers or os.cpu_count() or 4
+            self.workers = [PytkdocsWorker(setup_commands)]
+        self.idle_workers: "queue.Queue[BaseWorker]" = queue.Queue()
+        self.idle_workers.put(self.workers[0])
 
-        self.process = Popen(  # noqa: S603,S607 (we trust the input, and we don't want to use the absolute path)
-            cmd, universal_newlines=True, stderr=PIPE, stdout=PIPE, stdin=PIPE, bufsize=-1, env=env,
-        )
+        self.pending: Dict[str, dict] = {}
+        self.futures: Dict[str, Future] = {}
+        self.collected: Dict[str, Mapping[str, Any]] = {}
+
+        # most objects are collected with the default options: their key is spliced around their path,
+        # see the _key method, with the options encoded once here
+        default_key = json.dumps({"path": "\0", **self.DEFAULT_CONFIG}, sort_keys=True)
+        self.default_key = default_key.split(json.dumps("\0"))
+
+        self.cache: Optional[CollectionCache] = None
+        if cache_dir is not None:
+            self.cache = CollectionCache(cache_dir, setup_commands)
 
     def collect(self, identifier: str, config: dict) -> Any:
         """
         Collect the documentation tree given an identifier and selection options.
 
-        In this method, we feed one line of JSON to the standard input of the subprocess that was opened
-        during instantiation of the collector. Then we read one line of JSON on its standard output.
+        The identifier is [enqueued][mkdocstrings.handlers.python.PythonCollector.enqueue] if it wasn't already,
+        and the queue is [flushed][mkdocstrings.handlers.python.PythonCollector.flush] if the object
+        was not collected yet. Identifiers enqueued beforehand are therefore collected in the same batch.
 
-        We load back the JSON text into a Python dictionary.
-        If there is a decoding error, we log it as error and raise a CollectionError.
+        Arguments:
+            identifier: The dotted-path of a Python object available in the Python path.
+            config: Selection options, used to alter the data collection done by `pytkdocs`.
 
-        If the dictionary contains an `error` key, we log it  as error (with the optional `traceback` value),
-        and raise a CollectionError.
+        Raises:
+            CollectionError: When there was a problem collecting the object.
 
-        If the dictionary values for keys `loading_errors` and `parsing_errors` are not empty,
-        we log them as warnings.
+        Returns:
+            The collected object-tree, as a [read-only view][mkdocstrings.handlers.python.freeze].
+            Collecting the same object with the same options again returns the same view.
+        """
+        key = self._enqueue(identifier, config)
+        if not self.futures[key].done():
+            self.flush()
+        future = self.futures.pop(key)
+        if not future.done():
+            raise CollectionError(f"'{identifier}' was not collected")
+        return future.result()
 
-        Then we pick up the only object within the `objects` list (there's always only one, because we collect
-        them one by one), rebuild it's categories lists
-        (see [`rebuild_category_lists()`][mkdocstrings.handlers.python.rebuild_category_lists]),
-        and return it.
+    def enqueue(self, identifier: str, config: dict) -> None:
+        """
+        Queue an identifier and its selection options up for the next batch.
+
+        Enqueueing the same identifier with the same options twice is a no-op.
 
         Arguments:
             identifier: The dotted-path of a Python object available in the Python path.
             config: Selection options, used to alter the data collection done by `pytkdocs`.
-
-        Returns:
-            The collected object-tree.
         """
-        final_config = dict(self.DEFAULT_CONFIG)
-        final_config.update(config)
+        self._enqueue(identifier, config)
 
-        log.debug("mkdocstrings.handlers.python: Preparing input")
-        json_input = json.dumps({"objects": [{"path": identifier, **final_config}]})
+    def _key(self, identifier: str, config: dict) -> str:
+        if config:
+            return json.dumps({"path": identifier, **self.DEFAULT_CONFIG, **config}, sort_keys=True)
+        return json.dumps(identifier).join(self.default_key)
 
-        log.debug("mkdocstrings.handlers.python: Writing to process' stdin")
-        print(json_input, file=self.process.stdin, flush=True)
+    def _enqueue(self, identifier: str, config: dict) -> str:
+        key = self._key(identifier, config)
+        if key not in self.futures:
+            self.futures[key] = Future()
+            if key in self.collected:
+                self.futures[key].set_result(self.collected[key])
+                return key
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is None:
+                self.pending[key] = {"path": identifier, **self.DEFAULT_CONFIG, **config}
+            else:
+                self._resolve(key, cached)
+        return key
 
-        log.debug("mkdocstrings.handlers.python: Reading process' stdout")
-        stdout = self.process.stdout.readline()  # type: ignore
+    def _resolve(self, key: str, obj: dict) -> None:
+        self.collected[key] = freeze(obj)
+        self.futures[key].set_result(self.collected[key])
 
-        log.debug("mkdocstrings.handlers.python: Loading JSON output as Python object")
+    def flush(self) -> None:
+        """
+        Collect every enqueued object.
+
+        The queue is split in as many batches as there are available workers, one batch per worker.
+        Each batch is written to its worker before reading any result, so that workers collect in parallel.
+        Then the results are [received][mkdocstrings.handlers.python.PythonCollector.receive]
+        in the order they complete.
+
+        If anything fails in the middle, the objects not collected yet are resolved with the error,
+        so that collecting them later does not wait for them forever.
+        """
+        batch, self.pending = self.pending, {}
+        if not batch:
+            return
+
+        keys = list(batch)
+        workers: List[BaseWorker] = []
+        unread: List[BaseWorker] = []
         try:
-            result = json.loads(stdout)
-        except json.decoder.JSONDecodeError as exception:
-            log.error(f"mkdocstrings.handlers.python: Error while loading JSON: {stdout}")
-            raise CollectionError(str(exception))
+            workers = self._acquire_workers(len(keys))
+            chunks = [{key: batch[key] for key in keys[index :: len(workers)]} for index in range(len(workers))]
+            sent = [(worker, chunk) for worker, chunk in zip(workers, chunks) if self._send(worker, chunk)]
+            unread = [worker for worker, _ in sent]
+            for worker, chunk, result in self._gather(sent):
+                unread.remove(worker)
+                self.receive(worker, chunk, result)
+        except BaseException as error:
+            for key in batch:
+                if not self.futures[key].done():
+                    self.futures[key].set_exception(CollectionError(f"collection interrupted: {error!r}"))
+            # results left in their pipes would be read as the results of the next batches
+            for worker in unread:
+                worker.terminate()
+            raise
+        finally:
+            self._release_workers(workers)
 
+    def receive(self, worker: "BaseWorker", batch: Dict[str, dict], result: dict) -> None:
+        """
+        Resolve the objects of a batch with the result received from a worker.
+
+        If the result contains an `error` key, we log it  as error (with the optional `traceback` value),
+        and set a CollectionError on the object. If the batch contains more than one object, each of them
+        is collected again on its own instead, so that errors are reported for the right identifier.
+
+        If the result values for keys `loading_errors` and `parsing_errors` are not empty,
+        we log them as warnings.
+
+        Then we rebuild the categories lists of each object within the `objects` list
+        (see [`rebuild_category_lists()`][mkdocstrings.handlers.python.rebuild_category_lists]),
+        store them in the cache, if any, and resolve them with read-only views.
+
+        Arguments:
+            worker: The worker the batch was sent to.
+            batch: The objects configurations (their path and selection options), by key.
+            result: The result read from the worker,
+                see [`BaseWorker.read()`][mkdocstrings.handlers.python.BaseWorker.read].
+        """
         if "error" in result:
             message = f"mkdocstrings.handlers.python: Collection failed: {result['error']}"
             if "traceback" in result:
                 message += f"\n{result['traceback']}"
-            log.error(message)
-            raise CollectionError(result["error"])
+
+            if len(batch) == 1:
+                log.error(message)
+                self.futures[next(iter(batch))].set_exception(CollectionError(result["error"]))
+            else:
+                # don't pollute the logs when the batch is about to be retried object by object
+                log.debug(message)
+                log.debug("mkdocstrings.handlers.python: Batch collection failed, collecting objects one by one")
+                retry_worker = worker
+                try:
+                    for key, obj_config in batch.items():
+                        if not retry_worker.alive:
+                            # one of the objects may have killed the subprocess: collect the next ones with a new one
+                            retry_worker = self._respawn_worker(retry_worker)
+                        if self._send(retry_worker, {key: obj_config}):
+                            self.receive(retry_worker, {key: obj_config}, retry_worker.recv())
+                finally:
+                    # the caller only knows about the worker it gave us
+                    if retry_worker is not worker:
+                        self._release_workers([retry_worker])
+            return
 
         if result["loading_errors"]:
             for error in result["loading_errors"]:
@@ -212,18 +437,511 @@ class PythonCollector(BaseCollector):
                 for error in errors:
                     log.warning(f"mkdocstrings.handlers.python: {error}")
 
-        # We always collect only one object at a time
-        result = result["objects"][0]
+        # objects with warnings are not cached, to report them again on the next run
+        warned = result["loading_errors"] or any(result["parsing_errors"].values())
+        cache = None if warned else self.cache
 
         log.debug("mkdocstrings.handlers.python: Rebuilding categories and children lists")
-        rebuild_category_lists(result)
+        for key, obj in zip(batch, result["objects"]):
+            rebuild_category_lists(obj)
+            if cache is not None:
+                cache.set(key, obj)
+            self._resolve(key, obj)
 
-        return result
+    def _gather(
+        self, sent: List[Tuple["BaseWorker", Dict[str, dict]]]
+    ) -> Iterator[Tuple["BaseWorker", Dict[str, dict], dict]]:
+        log.debug("mkdocstrings.handlers.python: Reading process' stdout")
+        if len(sent) == 1 or sys.platform == "win32":
+            # selectors only support sockets on Windows
+            for worker, batch in sent:
+                yield worker, batch, worker.recv()
+            return
+
+        with selectors.DefaultSelector() as selector:
+            for worker, batch in sent:
+                selector.register(worker, selectors.EVENT_READ, (worker, batch))
+            while selector.get_map():
+                for selector_key, _ in selector.select():
+                    worker, batch = selector_key.data
+                    result = worker.read()
+                    if result is not None:
+                        selector.unregister(worker)
+                        yield worker, batch, result
+
+    def _send(self, worker: "BaseWorker", batch: Dict[str, dict]) -> bool:
+        log.debug("mkdocstrings.handlers.python: Writing to process' stdin")
+        try:
+            worker.send(list(batch.values()))
+        except CollectionError as error:
+            for key in batch:
+                self.futures[key].set_exception(error)
+            return False
+        return True
+
+    def _acquire_workers(self, count: int) -> List["BaseWorker"]:
+        workers: List[BaseWorker] = []
+        try:
+            while len(workers) < count:
+                try:
+                    workers.append(self.idle_workers.get_nowait())
+                except queue.Empty:
+                    if len(self.workers) < self.max_workers:
+                        worker = PytkdocsWorker(self.setup_commands)
+                        self.workers.append(worker)
+                        workers.append(worker)
+                    elif workers:
+                        break
+                    else:
+                        # nothing else can release a worker while we wait: don't block forever
+                        raise CollectionError("no Python worker available")
+        except BaseException:
+            # the caller never gets the workers acquired so far: give them back
+            self._release_workers(workers)
+            raise
+        return workers
+
+    def _release_workers(self, workers: List["BaseWorker"]) -> None:
+        for worker in workers:
+            if worker.alive:
+                self.idle_workers.put(worker)
+            elif worker in self.workers:  # respawned workers are already removed
+                self.workers.remove(worker)
+                worker.terminate()
+
+    def _respawn_worker(self, worker: "BaseWorker") -> "BaseWorker":
+        new_worker = PytkdocsWorker(self.setup_commands)
+        self.workers[self.workers.index(worker)] = new_worker
+        worker.terminate()
+        return new_worker
 
     def teardown(self) -> None:
-        """Terminate the opened subprocess, set it to `None`."""
+        """Terminate the workers, and save the cache."""
+        for worker in self.workers:
+            worker.terminate()
+        self.workers.clear()
+        if self.cache is not None:
+            self.cache.save()
+
+
+class BaseWorker:
+    """
+    A base class for the workers of the [Python collector][mkdocstrings.handlers.python.PythonCollector].
+
+    A worker is sent a batch of objects to collect, then its result is read back, one batch at a time.
+    """
+
+    @property
+    def alive(self) -> bool:
+        """Tell if the worker can still collect objects."""
+        raise NotImplementedError
+
+    def send(self, objects: List[dict]) -> None:
+        """
+        Send a batch of objects to collect.
+
+        Arguments:
+            objects: The objects configurations: their path and selection options.
+
+        Raises:
+            CollectionError: When the batch cannot be sent.
+        """
+        raise NotImplementedError
+
+    def read(self) -> Optional[dict]:
+        """
+        Read the next part of the result of the last batch, and return the result once it is complete.
+
+        Returns:
+            The result as returned by `pytkdocs`, an error result, or `None` if the result is not complete yet.
+        """
+        raise NotImplementedError
+
+    def recv(self) -> dict:
+        """
+        Receive the result of a batch, waiting for it as long as needed.
+
+        Returns:
+            The result, see [`read()`][mkdocstrings.handlers.python.BaseWorker.read].
+        """
+        result = None
+        while result is None:
+            result = self.read()
+        return result
+
+    def fileno(self) -> int:
+        """
+        Return the file descriptor the results are read from, to wait for several workers at once.
+
+        Raises:
+            NotImplementedError: When the results are not read from a file descriptor.
+
+        Returns:
+            The file descriptor.
+        """
+        raise NotImplementedError
+
+    def terminate(self) -> None:
+        """Stop the worker, and release its resources."""
+        raise NotImplementedError
+
+
+class PytkdocsWorker(BaseWorker):
+    """
+    A `pytkdocs` subprocess, running the [`pytkdocs_worker`][mkdocstrings.handlers.pytkdocs_worker] script.
+
+    It exchanges length-prefixed JSON messages with the collector: see the script documentation for their format.
+    """
+
+    def __init__(self, setup_commands: Optional[List[str]] = None) -> None:
+        """
+        Initialization method.
+
+        We open a subprocess in the background with `subprocess.Popen`. It runs the optional setup commands,
+        then the [`pytkdocs_worker`][mkdocstrings.handlers.pytkdocs_worker] script, which loads documentation
+        with `pytkdocs`.
+
+        Arguments:
+            setup_commands: A list of python commands as strings to be executed in the subprocess before `pytkdocs`.
+        """
+        log.debug("mkdocstrings.handlers.python: Opening 'pytkdocs' subprocess")
+        env = os.environ.copy()
+        env["PYTHONUNBUFFERED"] = "1"
+
+        commands = ["import runpy"]
+        if setup_commands:
+            # prevent the Python interpreter or the setup commands
+            # from writing to stdout as it would break pytkdocs output
+            commands += [
+                "import sys",
+                "from io import StringIO",
+                "sys.stdout = StringIO()",  # redirect stdout to memory buffer
+                *setup_commands,
+                "sys.stdout.flush()",
+                "sys.stdout = sys.__stdout__",  # restore stdout
+            ]
+        commands.append(f"runpy.run_path({pytkdocs_worker.__file__!r}, run_name='__main__')")
+        cmd = [sys.executable, "-c", "; ".join(commands)]
+
+        self.process = Popen(  # noqa: S603 (we trust the input)
+            cmd, stderr=PIPE, stdout=PIPE, stdin=PIPE, bufsize=0, env=env,
+        )
+        self.stdout = self.process.stdout.fileno()  # type: ignore
+        enlarge_pipes(self.process.stdin.fileno(), self.stdout)  # type: ignore
+
+        # keys of the filters registered in the subprocess, see the send method
+        self.filters_keys: Dict[Tuple[str, ...], str] = {}
+
+        # state of the message being read, see the read method
+        self.header = bytearray(pytkdocs_worker.HEADER_SIZE)
+        self.header_size = 0
+        self.buffer = bytearray(PIPE_SIZE)  # reused for every message, grown to the largest one
+        self.received = 0
+        self.payload_size: Optional[int] = None
+
+        # set once the subprocess is known to be gone, before it is even reaped
+        self.exited = False
+
+        # drain stderr continuously, otherwise the subprocess would block once the pipe is full;
+        # buffered, so that lines are not read one byte per system call
+        self.stderr = io.BufferedReader(self.process.stderr)  # type: ignore
+        self.stderr_thread = threading.Thread(target=self._pump_stderr, daemon=True)
+        self.stderr_thread.start()
+
+    @property
+    def alive(self) -> bool:
+        """Tell if the subprocess is still running."""
+        return not self.exited and self.process.poll() is None
+
+    def send(self, objects: List[dict]) -> None:
+        """
+        Send a batch of objects to collect.
+
+        Arguments:
+            objects: The objects configurations: their path and selection options.
+
+        Raises:
+            CollectionError: When the subprocess cannot be written to.
+        """
+        filters: Dict[str, List[str]] = {}
+        requests = []
+        for obj_config in objects:
+            if "filters" in obj_config:
+                obj_config = dict(obj_config)
+                obj_filters = obj_config.pop("filters")
+                key = self.filters_keys.get(tuple(obj_filters))
+                if key is None:
+                    key = self.filters_keys[tuple(obj_filters)] = str(len(self.filters_keys))
+                    filters[key] = obj_filters
+                obj_config["filters_key"] = key
+            requests.append(obj_config)
+
+        payload = pytkdocs_worker.dumps({"filters": filters, "objects": requests})
+        try:
+            pytkdocs_worker.write_message(self.process.stdin.fileno(), payload)  # type: ignore
+        except OSError as error:
+            self.exited = True
+            log.error(f"mkdocstrings.handlers.python: Could not write to the 'pytkdocs' subprocess: {error}")
+            raise CollectionError(str(error))
+
+    def fileno(self) -> int:  # noqa: D102 (ignore missing docstring)
+        return self.stdout
+
+    def read(self) -> Optional[dict]:
+        """
+        Read the next part of a result, and return the result once it is complete.
+
+        We read a message on the standard output of the subprocess in several calls, one read each,
+        so that several workers can be read from at the same time. Once the message is complete,
+        we load back its JSON text into a Python dictionary. If there is a decoding error,
+        or if the subprocess exited, we log it as error and return an error result instead.
+
+        Returns:
+            The result as returned by `pytkdocs`, an error result, or `None` if the message is not complete yet.
+        """
+        if self.payload_size is None:
+            count = self._read_header()
+        else:
+            with memoryview(self.buffer) as buffer:
+                count = self._readv([buffer[self.received : self.payload_size]])
+            self.received += count
+        if not count:
+            return self._exited()
+
+        if self.payload_size is None or self.received < self.payload_size:
+            return None
+
+        size, self.received, self.payload_size = self.payload_size, 0, None
+
+        log.debug("mkdocstrings.handlers.python: Loading JSON output as Python object")
+        with memoryview(self.buffer) as buffer, buffer[:size] as payload:
+            try:
+                return pytkdocs_worker.loads(payload)
+            except ValueError as exception:
+                log.error(f"mkdocstrings.handlers.python: Error while loading JSON: {str(payload, errors='replace')}")
+                return {"error": str(exception)}
+
+    def _read_header(self) -> int:
+        # read the header and the beginning of the payload at once, directly in the reusable buffer:
+        # the subprocess only writes one message per request, so we can't read past its end
+        with memoryview(self.header) as header:
+            missing = len(header) - self.header_size
+            count = self._readv([header[self.header_size :], self.buffer])
+
+        self.header_size += min(count, missing)
+        if self.header_size == pytkdocs_worker.HEADER_SIZE:
+            self.payload_size = int.from_bytes(self.header, "big")
+            self.header_size = 0
+            self.received = max(count - missing, 0)
+            if self.payload_size > len(self.buffer):
+                self.buffer.extend(bytes(self.payload_size - len(self.buffer)))
+        return count
+
+    def _readv(self, buffers: list) -> int:
+        if hasattr(os, "readv"):
+            return os.readv(self.stdout, buffers)
+        # without readv (Windows), fill the first buffer only, still without copy
+        return self.process.stdout.readinto(buffers[0])  # type: ignore
+
+    def _exited(self) -> dict:
+        self.header_size, self.received, self.payload_size = 0, 0, None
+        self.exited = True
+        log.error("mkdocstrings.handlers.python: The 'pytkdocs' subprocess exited unexpectedly")
+        return {"error": "the 'pytkdocs' subprocess exited unexpectedly"}
+
+    def _pump_stderr(self) -> None:
+        for line in self.stderr:
+            log.warning(f"mkdocstrings.handlers.python: pytkdocs: {line.decode(errors='replace').rstrip()}")
+
+    def terminate(self) -> None:
+        """
+        Terminate the subprocess, and close its pipes.
+
+        Closing its standard input first lets the subprocess exit on its own.
+        It is terminated only if it does not exit quickly, for example when it is still collecting objects.
+        """
         log.debug("mkdocstrings.handlers.python: Tearing process down")
-        self.process.terminate()
+        try:
+            self.process.stdin.close()  # type: ignore
+        except OSError:  # broken pipe, if the subprocess already exited
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except TimeoutExpired:
+            self.process.terminate()
+            self.process.wait()
+        self.stderr_thread.join(timeout=1)
+        self.process.stdout.close()  # type: ignore
+        self.stderr.close()
+
+
+class InProcessWorker(BaseWorker):
+    """
+    A worker collecting objects in the current process rather than in a `pytkdocs` subprocess.
+
+    It saves the cost of spawning subprocesses and exchanging JSON messages with them,
+    and returns the same results. But the documented modules are imported in the MkDocs process:
+    they are not reloaded when serving the documentation, and can write on its standard output.
+    """
+
+    def __init__(self) -> None:
+        """Initialization method."""
+        self.filters: Dict[str, List[str]] = {}
+        self.loaders: Dict[Tuple[str, ...], Any] = {}
+        self.result: Optional[dict] = None
+
+    @property
+    def alive(self) -> bool:
+        """Tell if the worker can still collect objects: it always can."""
+        return True
+
+    def send(self, objects: List[dict]) -> None:
+        """
+        Collect a batch of objects right away.
+
+        Arguments:
+            objects: The objects configurations: their path and selection options.
+        """
+        try:
+            self.result = pytkdocs_worker.process_request({"objects": objects}, self.filters, self.loaders)
+        except (Exception, SystemExit) as error:
+            # Don't fail on error, like the subprocess, nor exit when a documented module calls `sys.exit`
+            self.result = {"error": str(error), "traceback": traceback.format_exc()}
+
+    def read(self) -> Optional[dict]:
+        """
+        Return the result of the last batch.
+
+        Returns:
+            The result as returned by `pytkdocs`, or an error result.
+        """
+        result, self.result = self.result, None
+        return result
+
+    def terminate(self) -> None:
+        """Do nothing: there is no subprocess to terminate."""
+
+
+class CollectionCache:
+    """
+    A persistent cache of collected objects.
+
+    Objects are stored with the modification times of the files they were collected from,
+    and of the directories of the packages among them, which change when modules are added or removed.
+    An object is collected again as soon as one of these files or directories changed.
+    It saves a lot of time when serving the documentation, as most objects do not change between two builds.
+
+    The cache is saved as JSON in a `python.json` file, in the given directory. It is discarded as a whole
+    when the setup commands or the version of `pytkdocs` change.
+    """
+
+    VERSION = 3
+    """The version of the cache file format."""
+
+    def __init__(self, directory: str, setup_commands: Optional[List[str]] = None) -> None:
+        """
+        Initialization method.
+
+        The cache is loaded from the given directory, if it exists there.
+
+        Arguments:
+            directory: The directory containing the cache.
+            setup_commands: The setup commands of the collector using this cache.
+        """
+        self.path = Path(directory) / "python.json"
+        self.header = {"version": self.VERSION, "pytkdocs": get_pytkdocs_version(), "setup": setup_commands or []}
+        self.entries: Dict[str, dict] = {}
+        self.rebuilt: Set[str] = set()
+        self.modified = False
+
+        try:
+            data = pytkdocs_worker.loads(self.path.read_bytes())
+        except (OSError, ValueError):
+            return
+        if data.get("header") == self.header:
+            self.entries = data["entries"]
+            log.debug(f"mkdocstrings.handlers.python: Loaded {len(self.entries)} cached objects")
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Get a cached object, if it is still fresh.
+
+        Arguments:
+            key: The key of the object.
+
+        Returns:
+            The object, or `None` if it is not cached, or if its files were modified since it was collected.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        for file_path, mtime in entry["files"].items():
+            try:
+                fresh = os.stat(file_path).st_mtime_ns == mtime
+            except OSError:
+                fresh = False
+            if not fresh:
+                del self.entries[key]
+                self.rebuilt.discard(key)
+                self.modified = True
+                return None
+
+        if key not in self.rebuilt:
+            rebuild_category_lists(entry["object"])
+            self.rebuilt.add(key)
+        return entry["object"]
+
+    def set(self, key: str, obj: dict) -> None:
+        """
+        Cache an object.
+
+        Arguments:
+            key: The key of the object.
+            obj: The collected object, with its category lists rebuilt.
+        """
+        files = {}
+        stack = [obj]
+        while stack:
+            node = stack.pop()
+            file_path = node["file_path"]
+            paths = [file_path] if file_path else []
+            if file_path and os.path.basename(file_path) == "__init__.py":
+                paths.append(os.path.dirname(file_path))
+            for path in paths:
+                if path in files:
+                    continue
+                try:
+                    files[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    return
+            stack.extend(node["children"])
+
+        self.entries[key] = {"files": files, "object": obj}
+        self.rebuilt.add(key)
+        self.modified = True
+
+    def save(self) -> None:
+        """Write the cache on the disk, if it was modified."""
+        if not self.modified:
+            return
+
+        entries = {
+            key: {"files": entry["files"], "object": flatten_category_lists(entry["object"])}
+            if key in self.rebuilt
+            else entry
+            for key, entry in self.entries.items()
+        }
+        log.debug(f"mkdocstrings.handlers.python: Saving {len(entries)} objects in cache")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.path.with_suffix(".tmp")
+            temporary_path.write_bytes(pytkdocs_worker.dumps({"header": self.header, "entries": entries}))
+            os.replace(temporary_path, self.path)
+        except OSError as error:
+            log.warning(f"mkdocstrings.handlers.python: Could not save cache: {error}")
+        else:
+            self.modified = False
 
 
 class PythonHandler(BaseHandler):
@@ -231,7 +949,14 @@ class PythonHandler(BaseHandler):
 
 
 def get_handler(
-    theme: str, custom_templates: Optional[str] = None, setup_commands: Optional[List[str]] = None, **kwargs: Any
+    theme: str,
+    custom_templates: Optional[str] = None,
+    setup_commands: Optional[List[str]] = None,
+    cache_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    template_engine: str = "jinja2",
+    in_process: bool = False,
+    **kwargs: Any,
 ) -> PythonHandler:
     """
     Simply return an instance of `PythonHandler`.
@@ -240,37 +965,143 @@ def get_handler(
         theme: The theme to use when rendering contents.
         custom_templates: Directory containing custom templates.
         setup_commands: A list of commands as strings to be executed in the subprocess before `pytkdocs`.
+        cache_dir: A directory in which to persist collected objects from one run to the next.
+        max_workers: The maximum number of `pytkdocs` subprocesses collecting objects in parallel.
+        template_engine: The engine rendering the templates: `jinja2` or `minijinja`.
+        in_process: Whether to collect objects in the MkDocs process, when there are no setup commands.
 
     Returns:
         An instance of `PythonHandler`.
     """
     return PythonHandler(
-        collector=PythonCollector(setup_commands=setup_commands),
-        renderer=PythonRenderer("python", theme, custom_templates),
+        collector=PythonCollector(
+            setup_commands=setup_commands, cache_dir=cache_dir, max_workers=max_workers, in_process=in_process
+        ),
+        renderer=PythonRenderer("python", theme, custom_templates, template_engine),
     )
 
 
+def get_pytkdocs_version() -> str:
+    """
+    Get the installed version of `pytkdocs`.
+
+    Returns:
+        The version string.
+    """
+    try:
+        from importlib.metadata import version
+    except ImportError:  # Python < 3.8
+        from pkg_resources import get_distribution
+
+        return get_distribution("pytkdocs").version
+    return version("pytkdocs")
+
+
+def enlarge_pipes(*fds: int) -> None:
+    """
+    Enlarge the buffers of pipes to [`PIPE_SIZE`][mkdocstrings.handlers.python.PIPE_SIZE] bytes.
+
+    With larger buffers, `pytkdocs` can write big JSON outputs without blocking again and again,
+    waiting for us to read them. It only works on Linux, and does nothing on other platforms.
+
+    Arguments:
+        fds: The file descriptors of the pipes.
+    """
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return
+
+    size = PIPE_SIZE
+    try:
+        with open("/proc/sys/fs/pipe-max-size") as max_size_file:
+            size = min(size, int(max_size_file.read()))
+    except (OSError, ValueError):
+        pass
+
+    for fd in fds:
+        try:
+            fcntl.fcntl(fd, F_SETPIPE_SZ, size)
+        except OSError as error:
+            log.debug(f"mkdocstrings.handlers.python: Could not enlarge pipe buffer: {error}")
+
+
 def rebuild_category_lists(obj: dict) -> None:
     """
-    Recursively rebuild the category lists of a collected object.
+    Rebuild the category lists of a collected object and of all its descendants.
 
     Since `pytkdocs` dumps JSON on standard output, it must serialize the object-tree and flatten it to reduce data
     duplication and avoid cycle-references. Indeed, each node of the object-tree has a `children` list, containing
     all children, and another list for each category of children: `attributes`, `classes`, `functions`, `methods`
-    and `modules`. It replaces the values in category lists with only the paths of the objects.
+    and `modules`. The values in category lists are replaced with the indices of the objects in the `children` list
+    (see [`index_category_lists()`][mkdocstrings.handlers.pytkdocs_worker.index_category_lists]).
 
-    Here, we reconstruct these category lists by picking objects in the `children` list using their path.
+    Here, we reconstruct these category lists by picking objects in the `children` list using their index.
 
-    For each object, we recurse on every one of its children.
+    The object-tree is walked with an explicit stack rather than recursion, and each list is rewritten in place.
 
     Args:
         obj: The collected object, loaded back from JSON into a Python dictionary.
     """
-    obj["attributes"] = [obj["children"][path] for path in obj["attributes"]]
-    obj["classes"] = [obj["children"][path] for path in obj["classes"]]
-    obj["functions"] = [obj["children"][path] for path in obj["functions"]]
-    obj["methods"] = [obj["children"][path] for path in obj["methods"]]
-    obj["modules"] = [obj["children"][path] for path in obj["modules"]]
-    obj["children"] = [v for k, v in obj["children"].items()]
-    for child in obj["children"]:
-        rebuild_category_lists(child)
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        children = node["children"]
+        for category in pytkdocs_worker.CATEGORY_LISTS:
+            indices = node[category]
+            for index, child_index in enumerate(indices):
+                indices[index] = children[child_index]
+        stack.extend(children)
+
+
+def freeze(obj: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """
+    Return a read-only view of a collected object and of all its descendants.
+
+    Dictionaries are wrapped in [mapping proxies][types.MappingProxyType], and lists are turned into tuples,
+    so that templates cannot modify objects shared between several renderings.
+    Nodes appearing several times in the tree, like children also listed in category lists, are still shared.
+
+    Args:
+        obj: The collected object, with its category lists rebuilt.
+        memo: The values already frozen, by identity of the original values.
+
+    Returns:
+        A read-only copy of the object.
+    """
+    if memo is None:
+        memo = {}
+    if id(obj) in memo:
+        return memo[id(obj)]
+    if isinstance(obj, dict):
+        frozen: Any = MappingProxyType({key: freeze(value, memo) for key, value in obj.items()})
+    elif isinstance(obj, list):
+        frozen = tuple(freeze(value, memo) for value in obj)
+    else:
+        return obj
+    memo[id(obj)] = frozen
+    return frozen
+
+
+def flatten_category_lists(obj: dict) -> dict:
+    """
+    Flatten the category lists of a collected object and of all its descendants.
+
+    It is the reverse operation of [`rebuild_category_lists()`][mkdocstrings.handlers.python.rebuild_category_lists]:
+    category lists are replaced with the indices of the objects in the `children` lists.
+    The given object is not modified: copies of the nodes are returned.
+
+    Args:
+        obj: The collected object, with its category lists rebuilt.
+
+    Returns:
+        A copy of the object, that can be serialized to JSON without duplicating data.
+    """
+    root = dict(obj)
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        indices = {id(child): index for index, child in enumerate(node["children"])}
+        for category in pytkdocs_worker.CATEGORY_LISTS:
+            node[category] = [indices[id(child)] for child in node[category]]
+        node["children"] = [dict(child) for child in node["children"]]
+        stack.extend(node["children"])
+    return root
@@ -0,0 +1,238 @@
+"""
+This module runs `pytkdocs` in a loop, exchanging length-prefixed JSON messages on its standard input and output.
+
+It is not a handler: the [Python collector][mkdocstrings.handlers.python.PythonCollector] runs it as a script
+in a subprocess, and uses its functions to talk to it.
+
+Requests are the configurations expected by `pytkdocs`, with one addition: filters can be registered
+under a key in the `filters` dictionary of a request, and objects of this request and of the next ones
+can then reference them with a `filters_key` instead of repeating them. In results, the `children` of each object
+are a list, and its category lists (`attributes`, `classes`, etc.) contain indices in this list.
+
+Each message is made of a header, a 4-bytes big-endian unsigned integer telling the size of the payload,
+followed by the payload itself, some UTF-8 encoded JSON. Unlike line-delimited JSON, messages of any size
+can be read at once, without scanning them for newlines.
+
+JSON is encoded and decoded with [`orjson`](https://github.com/ijl/orjson) if it is installed,
+and with the standard library otherwise.
+"""
+
+import json
+import os
+import sys
+import traceback
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+HEADER_SIZE = 4
+"""The size of the header of each message, in bytes."""
+
+CATEGORY_LISTS = ("attributes", "classes", "functions", "methods", "modules")
+"""The keys of the lists of children of each category in a collected object."""
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode an object as JSON.
+
+    Arguments:
+        obj: The object to encode.
+
+    Returns:
+        The UTF-8 encoded JSON text.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def loads(payload: Union[bytes, bytearray, memoryview]) -> Any:
+    """
+    Decode a JSON payload.
+
+    Arguments:
+        payload: The UTF-8 encoded JSON text. It can be a view on a part of a larger buffer.
+
+    Raises:
+        ValueError: When the payload is not valid JSON.
+
+    Returns:
+        The decoded object.
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(str(payload, "utf-8"))
+
+
+def read_exactly(fd: int, size: int) -> bytearray:
+    """
+    Read exactly `size` bytes from a file descriptor.
+
+    Arguments:
+        fd: The file descriptor to read from.
+        size: The number of bytes to read.
+
+    Raises:
+        EOFError: When the end of file is reached before reading enough bytes.
+
+    Returns:
+        The bytes read.
+    """
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = os.read(fd, size - len(buffer))
+        if not chunk:
+            raise EOFError(f"expected {size} bytes, got {len(buffer)}")
+        buffer += chunk
+    return buffer
+
+
+def read_message(fd: int) -> Optional[bytearray]:
+    """
+    Read a message from a file descriptor.
+
+    Arguments:
+        fd: The file descriptor to read from.
+
+    Returns:
+        The payload of the message, or `None` if the end of file was reached before a new message.
+    """
+    try:
+        header = read_exactly(fd, HEADER_SIZE)
+    except EOFError:
+        return None
+    return read_exactly(fd, int.from_bytes(header, "big"))
+
+
+def write_message(fd: int, payload: bytes) -> None:
+    """
+    Write a message to a file descriptor.
+
+    The header and the payload are written with a single `writev` system call when possible,
+    without concatenating them first. On platforms without `writev`, they are written one after the other.
+
+    Arguments:
+        fd: The file descriptor to write to.
+        payload: The payload of the message.
+    """
+    buffers = [memoryview(len(payload).to_bytes(HEADER_SIZE, "big")), memoryview(payload)]
+    while buffers:
+        if hasattr(os, "writev"):
+            written = os.writev(fd, buffers)
+        else:
+            written = os.write(fd, buffers[0])
+        # drop what was written, the call may have been partial
+        while buffers and written >= len(buffers[0]):
+            written -= len(buffers.pop(0))
+        if buffers:
+            buffers[0] = buffers[0][written:]
+
+
+def index_category_lists(obj: dict) -> None:
+    """
+    Replace the paths in the category lists of a serialized object and of all its descendants with indices.
+
+    `pytkdocs` serializes the `children` of each object as a dictionary, and its category lists
+    as lists of paths, keys of this dictionary. Here, we turn `children` into a list, and the paths into
+    indices in this list, so that category lists can be rebuilt by indexing lists instead of looking up
+    dictionaries. The object is modified in place.
+
+    Arguments:
+        obj: The object serialized by `pytkdocs`.
+    """
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        indices = {path: index for index, path in enumerate(node["children"])}
+        for category in CATEGORY_LISTS:
+            paths = node[category]
+            for index, path in enumerate(paths):
+                paths[index] = indices[path]
+        node["children"] = list(node["children"].values())
+        stack.extend(node["children"])
+
+
+def process_request(request: dict, filters: Dict[str, List[str]], loaders: Dict[Tuple[str, ...], Any]) -> dict:
+    """
+    Process a request, like `pytkdocs.cli.process_config` does.
+
+    Unlike `pytkdocs`, we reuse a loader for all the objects having the same filters,
+    so that their regular expressions are compiled only once.
+
+    Arguments:
+        request: The request: the objects configurations, and the filters to register.
+        filters: The filters registered by the previous requests, updated in place.
+        loaders: The loaders created by the previous requests, by filters, updated in place.
+
+    Returns:
+        The collected documentation along with the errors that occurred.
+    """
+    from pytkdocs.cli import extract_errors
+    from pytkdocs.loader import Loader
+    from pytkdocs.serializer import serialize_object
+
+    filters.update(request.get("filters", {}))
+    collected = []
+    loading_errors = []
+    parsing_errors = {}
+
+    for obj_config in request["objects"]:
+        if "filters_key" in obj_config:
+            obj_filters = tuple(filters[obj_config["filters_key"]])
+        else:
+            obj_filters = tuple(obj_config.get("filters", []))
+        loader = loaders.get(obj_filters)
+        if loader is None:
+            loader = loaders[obj_filters] = Loader(filters=list(obj_filters))
+        loader.errors = []
+
+        members = obj_config.get("members", set())
+        if isinstance(members, list):
+            members = set(members)
+        obj = loader.get_object_documentation(obj_config["path"], members)
+
+        loading_errors.extend(loader.errors)
+        parsing_errors.update(extract_errors(obj))
+        serialized_obj = serialize_object(obj)
+        index_category_lists(serialized_obj)
+        collected.append(serialized_obj)
+
+    return {"loading_errors": loading_errors, "parsing_errors": parsing_errors, "objects": collected}
+
+
+def main() -> int:
+    """
+    Process requests read on standard input and write the results on standard output, until the end of file.
+
+    Anything the documented code writes on standard output is redirected to standard error,
+    so it cannot corrupt the messages.
+
+    Returns:
+        An exit code.
+    """
+    filters: Dict[str, List[str]] = {}
+    loaders: Dict[Tuple[str, ...], Any] = {}
+
+    stdin = sys.stdin.fileno()
+    sys.stdout.flush()
+    stdout = os.dup(sys.stdout.fileno())
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    while True:
+        message = read_message(stdin)
+        if message is None:
+            return 0
+        try:
+            payload = dumps(process_request(loads(message), filters, loaders))
+        except Exception as error:
+            # Don't fail on error. We must handle the next requests.
+            payload = dumps({"error": str(error), "traceback": traceback.format_exc()})
+        write_message(stdout, payload)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -105,6 +105,7 @@ class MkdocstringsPlugin(BasePlugin):
                 - "import django"
                 - "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_djang_app.settings')"
                 - "django.setup()"
+              cache_dir: ".mkdocstrings_cache"
             rust:
               selection:
                 selection_opt: 2
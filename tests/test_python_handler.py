@@ -0,0 +1,306 @@
+"""Tests for the Python handler."""
+
+import os
+
+import pytest
+from markdown import Markdown
+
+from mkdocstrings.handlers import CollectionError, pytkdocs_worker
+from mkdocstrings.handlers.python import (
+    PythonCollector,
+    PythonRenderer,
+    flatten_category_lists,
+    rebuild_category_lists,
+)
+
+
+@pytest.fixture()
+def collector():
+    """Yield a Python collector, and tear it down afterwards."""
+    python_collector = PythonCollector()
+    yield python_collector
+    python_collector.teardown()
+
+
+def test_collect_enqueued_objects_in_one_batch(collector):
+    """Collect every enqueued object when collecting the first one."""
+    collector.enqueue("json", {})
+    collector.enqueue("textwrap", {})
+    assert collector.collect("json", {})["path"] == "json"
+    assert not collector.pending
+    assert collector.collect("textwrap", {})["path"] == "textwrap"
+
+
+def test_keys_of_objects_with_default_options(collector):
+    """Build the same keys for objects with default options as with explicit ones."""
+    for identifier in ("json", 'quoted"path', "non_ascii_\u00e9"):
+        assert collector._key(identifier, {}) == collector._key(identifier, {"filters": ["!^_[^_]"]})
+
+
+def test_collection_error_is_reported_for_the_right_object(collector):
+    """Report collection errors on the failing object only, even in a batch."""
+    collector.enqueue("json", {})
+    collector.enqueue("does.not.exist", {})
+    with pytest.raises(CollectionError):
+        collector.collect("does.not.exist", {})
+    assert collector.collect("json", {})["path"] == "json"
+
+
+def test_setup_commands_output_is_discarded():
+    """Collect objects even if the setup commands write on standard output."""
+    python_collector = PythonCollector(setup_commands=["print('hello')"])
+    try:
+        assert python_collector.collect("json", {})["path"] == "json"
+    finally:
+        python_collector.teardown()
+
+
+def test_read_written_messages():
+    """Read back messages written on a pipe, then the end of file."""
+    read_fd, write_fd = os.pipe()
+    pytkdocs_worker.write_message(write_fd, b'{"objects": []}')
+    pytkdocs_worker.write_message(write_fd, b"")
+    os.close(write_fd)
+    assert pytkdocs_worker.read_message(read_fd) == b'{"objects": []}'
+    assert pytkdocs_worker.read_message(read_fd) == b""
+    assert pytkdocs_worker.read_message(read_fd) is None
+    os.close(read_fd)
+
+
+def test_rebuild_category_lists():
+    """Replace indices with objects in category lists, at every level."""
+    empty = {"attributes": [], "classes": [], "functions": [], "methods": [], "modules": []}
+    method = {"path": "a.B.c", "children": {}, **empty}
+    klass = {"path": "a.B", "children": {"a.B.c": method}, **empty, "methods": ["a.B.c"]}
+    module = {"path": "a", "children": {"a.B": klass}, **empty, "classes": ["a.B"]}
+    pytkdocs_worker.index_category_lists(module)
+    assert klass["methods"] == [0]
+    rebuild_category_lists(module)
+    assert module["classes"] == module["children"] == [klass]
+    assert klass["methods"] == klass["children"] == [method]
+    assert method["children"] == []
+    assert flatten_category_lists(module)["classes"] == [0]
+
+
+def test_cache_collected_objects(tmp_path):
+    """Reuse cached objects in the next runs, until their source file changes."""
+    module = tmp_path / "cached_module.py"
+    module.write_text('"""Docstring."""\n')
+    setup_commands = [f"sys.path.insert(0, {str(tmp_path)!r})"]
+    cache_dir = str(tmp_path / "cache")
+
+    python_collector = PythonCollector(setup_commands=setup_commands, cache_dir=cache_dir)
+    assert python_collector.collect("cached_module", {})["docstring"] == "Docstring."
+    python_collector.teardown()
+
+    python_collector = PythonCollector(setup_commands=setup_commands, cache_dir=cache_dir)
+    python_collector.enqueue("cached_module", {})
+    assert not python_collector.pending
+    assert python_collector.collect("cached_module", {})["docstring"] == "Docstring."
+    python_collector.teardown()
+
+    module.write_text('"""Changed."""\n')
+    os.utime(module, ns=(0, 0))
+    python_collector = PythonCollector(setup_commands=setup_commands, cache_dir=cache_dir)
+    python_collector.enqueue("cached_module", {})
+    assert python_collector.pending
+    assert python_collector.collect("cached_module", {})["docstring"] == "Changed."
+    python_collector.teardown()
+
+
+def test_cache_invalidated_by_new_submodules(tmp_path):
+    """Collect a cached package again when a module is added to it."""
+    package = tmp_path / "cached_package"
+    package.mkdir()
+    (package / "__init__.py").write_text('"""Docstring."""\n')
+    (package / "a.py").write_text('"""Module A."""\n')
+    setup_commands = [f"sys.path.insert(0, {str(tmp_path)!r})"]
+    cache_dir = str(tmp_path / "cache")
+
+    python_collector = PythonCollector(setup_commands=setup_commands, cache_dir=cache_dir)
+    children = python_collector.collect("cached_package", {})["children"]
+    assert [child["path"] for child in children] == ["cached_package.a"]
+    python_collector.teardown()
+
+    (package / "b.py").write_text('"""Module B."""\n')
+    os.utime(package, ns=(0, 0))
+    python_collector = PythonCollector(setup_commands=setup_commands, cache_dir=cache_dir)
+    children = python_collector.collect("cached_package", {})["children"]
+    assert sorted(child["path"] for child in children) == ["cached_package.a", "cached_package.b"]
+    python_collector.teardown()
+
+
+def test_collect_batch_with_several_workers():
+    """Split batches between workers, and spawn them as needed."""
+    python_collector = PythonCollector(max_workers=2)
+    try:
+        python_collector.enqueue("json", {})
+        python_collector.enqueue("textwrap", {})
+        python_collector.enqueue("does.not.exist", {})
+        assert python_collector.collect("json", {})["path"] == "json"
+        assert python_collector.collect("textwrap", {})["path"] == "textwrap"
+        with pytest.raises(CollectionError):
+            python_collector.collect("does.not.exist", {})
+        assert len(python_collector.workers) == 2
+    finally:
+        python_collector.teardown()
+
+
+def test_workers_are_kept_when_spawning_fails(monkeypatch):
+    """Keep the idle workers when spawning more of them fails."""
+    from mkdocstrings.handlers import python
+
+    def failing_worker(setup_commands):
+        raise OSError("cannot spawn")
+
+    python_collector = PythonCollector(max_workers=2)
+    try:
+        assert python_collector.collect("json", {})["path"] == "json"
+        monkeypatch.setattr(python, "PytkdocsWorker", failing_worker)
+        python_collector.enqueue("argparse", {})
+        python_collector.enqueue("textwrap", {})
+        with pytest.raises(OSError):
+            python_collector.collect("argparse", {})
+        assert python_collector.idle_workers.qsize() == 1
+        monkeypatch.undo()
+        assert python_collector.collect("string", {})["path"] == "string"
+    finally:
+        python_collector.teardown()
+
+
+def test_filters_are_sent_once(collector):
+    """Register filters in the subprocess once, and reference them by key afterwards."""
+    filters = ["!^_", "!^load", "!^detect"]
+    functions = collector.collect("json", {"filters": filters})["functions"]
+    assert [child["name"] for child in functions] == ["dump", "dumps"]
+    assert collector.collect("textwrap", {"filters": filters})["path"] == "textwrap"
+    assert "loads" in [child["name"] for child in collector.collect("json", {})["functions"]]
+    assert list(collector.workers[0].filters_keys.values()) == ["0", "1"]
+
+
+def test_collected_objects_are_shared_read_only_views(collector):
+    """Return the same read-only view when collecting an object twice."""
+    obj = collector.collect("json", {})
+    assert collector.collect("json", {}) is obj
+    assert any(child is obj["functions"][0] for child in obj["children"])
+    with pytest.raises(TypeError):
+        obj["path"] = "changed"
+
+
+def test_render_with_minijinja(collector):
+    """Render the same HTML with minijinja as with Jinja2."""
+    pytest.importorskip("minijinja")
+    obj = collector.collect("textwrap", {})
+    html = {}
+    for engine in ("jinja2", "minijinja"):
+        renderer = PythonRenderer("python", "material", template_engine=engine)
+        renderer.update_env(Markdown(), {"mdx": [], "mdx_configs": {}})
+        html[engine] = renderer.render(obj, {})
+    assert not renderer.jinja2_only
+    # minijinja also escapes slashes
+    assert html["minijinja"].replace("&#x2f;", "/") == html["jinja2"]
+
+
+def test_collect_in_process(collector):
+    """Collect the same objects in the current process as in a subprocess."""
+    in_process_collector = PythonCollector(in_process=True)
+    try:
+        assert in_process_collector.collect("textwrap", {}) == collector.collect("textwrap", {})
+        with pytest.raises(CollectionError):
+            in_process_collector.collect("does.not.exist", {})
+    finally:
+        in_process_collector.teardown()
+
+
+def test_exiting_modules_in_process(tmp_path, monkeypatch):
+    """Report modules exiting when imported in the current process as errors, instead of exiting."""
+    (tmp_path / "exiting_module.py").write_text("import sys\nsys.exit(1)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    in_process_collector = PythonCollector(in_process=True)
+    try:
+        with pytest.raises(CollectionError):
+            in_process_collector.collect("exiting_module", {})
+        in_process_collector.enqueue("exiting_module", {})
+        in_process_collector.enqueue("json", {})
+        assert in_process_collector.collect("json", {})["path"] == "json"
+    finally:
+        in_process_collector.teardown()
+
+
+def test_log_standard_error(tmp_path, caplog):
+    """Log what documented modules write on standard error, even a lot of it, without blocking them."""
+    (tmp_path / "noisy_module.py").write_text(
+        "import sys\nfor line in range(20000):\n    print('noise', line, 'x' * 40, file=sys.stderr)\n"
+    )
+    python_collector = PythonCollector(setup_commands=[f"sys.path.insert(0, {str(tmp_path)!r})"])
+    try:
+        assert python_collector.collect("noisy_module", {})["path"] == "noisy_module"
+    finally:
+        python_collector.teardown()
+    messages = [record.getMessage() for record in caplog.records]
+    assert f"mkdocstrings.handlers.python: pytkdocs: noise 0 {'x' * 40}" in messages
+    assert f"mkdocstrings.handlers.python: pytkdocs: noise 19999 {'x' * 40}" in messages
+
+
+def test_dead_workers_are_replaced(tmp_path):
+    """Replace a worker that exited while collecting an object, even in the middle of a batch."""
+    (tmp_path / "exiting_module.py").write_text("import sys\nsys.exit(1)\n")
+    python_collector = PythonCollector(setup_commands=[f"sys.path.insert(0, {str(tmp_path)!r})"], max_workers=1)
+    try:
+        with pytest.raises(CollectionError):
+            python_collector.collect("exiting_module", {})
+        assert python_collector.collect("json", {})["path"] == "json"
+
+        for identifier in ("argparse", "exiting_module", "textwrap"):
+            python_collector.enqueue(identifier, {})
+        assert python_collector.collect("string", {})["path"] == "string"
+        with pytest.raises(CollectionError):
+            python_collector.collect("exiting_module", {})
+        assert python_collector.collect("textwrap", {})["path"] == "textwrap"
+        assert len(python_collector.workers) == 1
+    finally:
+        python_collector.teardown()
+
+
+def test_interrupted_batch_does_not_block(collector, monkeypatch):
+    """Fail the objects left in a batch interrupted by an unexpected error, instead of waiting for them."""
+    from mkdocstrings.handlers import python
+
+    def rebuild_failing_on_json(obj):
+        if obj["path"] == "json":
+            raise RuntimeError("unexpected")
+        rebuild_category_lists(obj)
+
+    monkeypatch.setattr(python, "rebuild_category_lists", rebuild_failing_on_json)
+    collector.enqueue("json", {})
+    collector.enqueue("textwrap", {})
+    with pytest.raises(RuntimeError):
+        collector.collect("json", {})
+    with pytest.raises(CollectionError):
+        collector.collect("textwrap", {})
+    monkeypatch.undo()
+    assert collector.collect("textwrap", {})["path"] == "textwrap"
+
+
+def test_respawned_worker_is_released_on_error(tmp_path, monkeypatch):
+    """Give back the worker respawned while retrying a batch, even when an unexpected error interrupts the retry."""
+    from mkdocstrings.handlers import python
+
+    def rebuild_failing_on_json(obj):
+        if obj["path"] == "json":
+            raise RuntimeError("unexpected")
+        rebuild_category_lists(obj)
+
+    (tmp_path / "exiting_module.py").write_text("import sys\nsys.exit(1)\n")
+    python_collector = PythonCollector(setup_commands=[f"sys.path.insert(0, {str(tmp_path)!r})"], max_workers=1)
+    try:
+        monkeypatch.setattr(python, "rebuild_category_lists", rebuild_failing_on_json)
+        python_collector.enqueue("exiting_module", {})
+        python_collector.enqueue("json", {})
+        with pytest.raises(RuntimeError):
+            python_collector.collect("json", {})
+        monkeypatch.undo()
+        assert python_collector.collect("textwrap", {})["path"] == "textwrap"
+        assert len(python_collector.workers) == 1
+    finally:
+        python_collector.teardown()